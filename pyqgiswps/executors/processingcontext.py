@@ -11,6 +11,7 @@
 import os
 import logging
 import traceback
+import weakref
 
 from pathlib import Path
 from datetime import datetime
@@ -23,11 +24,110 @@ from pyqgiswps.qgscache.cachemanager import cacheservice
 from pyqgiswps.config import confservice
 from pyqgiswps.exceptions import InvalidParameterValue
 
-from qgis.core import (QgsProject, QgsMapLayer)
+from qgis.core import (QgsProject, QgsMapLayer, QgsWkbTypes, QgsProcessing)
 
 LOGGER = logging.getLogger('SRVLOG')
 
-from typing import Tuple, Union, Mapping, Any
+from typing import Tuple, Union, Mapping, Any, List, Dict, Iterable
+
+
+# Map processing source types to bit flags
+_TYPE_BIT = {
+    QgsProcessing.TypeVectorPoint      : 1 << 0,
+    QgsProcessing.TypeVectorLine       : 1 << 1,
+    QgsProcessing.TypeVectorPolygon    : 1 << 2,
+    QgsProcessing.TypeVectorAnyGeometry: 1 << 3,
+    QgsProcessing.TypeVector           : 1 << 4,
+    QgsProcessing.TypeRaster           : 1 << 5,
+    QgsProcessing.TypeMapLayer         : 1 << 6,
+    QgsProcessing.TypeFile             : 1 << 7,
+}
+
+_VECTOR_MASK = _TYPE_BIT[QgsProcessing.TypeVectorAnyGeometry] \
+             | _TYPE_BIT[QgsProcessing.TypeVector] \
+             | _TYPE_BIT[QgsProcessing.TypeMapLayer]
+
+_RASTER_MASK = _TYPE_BIT[QgsProcessing.TypeRaster] \
+             | _TYPE_BIT[QgsProcessing.TypeMapLayer]
+
+_GEOMETRY_BIT = {
+    QgsWkbTypes.PointGeometry  : _TYPE_BIT[QgsProcessing.TypeVectorPoint],
+    QgsWkbTypes.LineGeometry   : _TYPE_BIT[QgsProcessing.TypeVectorLine],
+    QgsWkbTypes.PolygonGeometry: _TYPE_BIT[QgsProcessing.TypeVectorPolygon],
+}
+
+
+def datatypes_mask( datatypes: Iterable[int] ) -> int:
+    """ Fold processing source types into a bit mask
+    """
+    mask = 0
+    for dtyp in datatypes:
+        mask |= _TYPE_BIT.get(dtyp, 0)
+    return mask
+
+
+class ProjectLayers:
+    """ Snapshot of the project layer types
+
+        The snapshot is rebuilt when layers are added to or 
+        removed from the project.
+    """
+    def __init__(self, project: QgsProject) -> None:
+        self._layer_masks = []
+        self._allowed_names = {}
+        self._dirty = True
+        project.layersAdded.connect(self._set_dirty)
+        project.layersRemoved.connect(self._set_dirty)
+
+    def _set_dirty(self, *args) -> None:
+        self._dirty = True
+
+    def update(self, project: QgsProject) -> None:
+        """ Rebuild the snapshot if the project layers have changed
+        """
+        if not self._dirty:
+            return
+        masks = []
+        for lyr in project.mapLayers().values():
+            typ = lyr.type()
+            if typ == QgsMapLayer.VectorLayer:
+                mask = _VECTOR_MASK | _GEOMETRY_BIT.get(lyr.geometryType(), 0)
+            elif typ == QgsMapLayer.RasterLayer:
+                mask = _RASTER_MASK
+            else:
+                continue
+            masks.append((lyr.name(), mask))
+        self._layer_masks = masks
+        self._allowed_names = {}
+        self._dirty = False
+
+    def allowed_layer_names(self, dt_mask: int) -> List[str]:
+        """ Return names of the layers matching the source types mask
+
+            Results are cached by mask until the snapshot is rebuilt.
+
+            :param dt_mask: mask of processing source types as
+                            returned by `datatypes_mask`
+        """
+        names = self._allowed_names.get(dt_mask)
+        if names is None:
+            names = [name for name, mask in self._layer_masks if mask & dt_mask]
+            self._allowed_names[dt_mask] = names
+        return list(names)
+
+
+_project_layers = weakref.WeakKeyDictionary()
+
+
+def get_project_layers( project: QgsProject ) -> ProjectLayers:
+    """ Return the layers snapshot for the project
+    """
+    layers = _project_layers.get(project)
+    if layers is None:
+        layers = ProjectLayers(project)
+        _project_layers[project] = layers
+    layers.update(project)
+    return layers
 
 
 class MapContext:
@@ -37,6 +137,7 @@ class MapContext:
         self.rootdir = Path(confservice.get('cache','rootdir'))
         self.map_uri = map_uri
         self._create_context = create_context
+        self._project = None
 
     @property
     def create_context(self) -> Mapping[str, Any]:
@@ -49,11 +150,35 @@ class MapContext:
         return context
 
     def project(self) -> QgsProject:
+        """ Return the map project
+
+            The project is looked up once, so that all definitions 
+            parsed with this context refer to the same project
+        """
+        if self._project is not None:
+            return self._project
         if self.map_uri is not None:
-            return cacheservice.lookup(self.map_uri)[0]
+            self._project = cacheservice.lookup(self.map_uri)[0]
+            return self._project
         else:
             raise RuntimeError('No map defined')
 
+    def project_timestamp(self) -> Any:
+        """ Return the timestamp of the cached map project
+
+            The project is not loaded: None is returned if there is no map
+            or if the project is not in the cache yet.
+        """
+        if self.map_uri is None:
+            return None
+        details = cacheservice.peek(self.map_uri)
+        return details.timestamp if details is not None else None
+
+    def project_layers(self) -> ProjectLayers:
+        """ Return the layers snapshot of the map project
+        """
+        return get_project_layers(self.project())
+
 
 class ProcessingContext(QgsProcessingContext):
 
@@ -9,13 +9,16 @@
 """ Wrap qgis processing algorithms in WPS process
 """
 import os
+import sys
+import json
+import shutil
 import logging
 import mimetypes
 import traceback
 
-from functools import partial
+from functools import partial, lru_cache
 from os.path import normpath, basename
-from urllib.parse import urlparse, urlencode, parse_qs
+from urllib.parse import urlparse, urlencode, parse_qs, unquote_plus
 from pathlib import Path
 
 from pyqgiswps.app.Common import Metadata
@@ -39,6 +42,7 @@ from pyqgiswps.app.WPSResponse import WPSResponse
 from pyqgiswps.app.WPSRequest  import WPSRequest
 
 from pyqgiswps.config import confservice
+from pyqgiswps.utils.lru import lrucache
 
 from osgeo import ogr
 
@@ -74,6 +78,8 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingFeedback,
                        QgsReferencedRectangle,
                        QgsReferencedPointXY,
+                       QgsPointXY,
+                       QgsPoint,
                        QgsRectangle,
                        QgsGeometry,
                        QgsMapLayer,
@@ -84,14 +90,14 @@ from qgis.core import (QgsProcessing,
                        QgsFeatureRequest)
 
 
-from .processingcontext import MapContext, ProcessingContext
+from .processingcontext import MapContext, ProcessingContext, datatypes_mask
 
 
 from processing.core.Processing import (Processing,
                                         ProcessingConfig,
                                         RenderingStyles)
 
-from typing import Mapping, Any, TypeVar, Union, Tuple
+from typing import Mapping, Any, TypeVar, Union, Tuple, List, FrozenSet, Type
 
 WPSInput  = Union[LiteralInput, ComplexInput, BoundingBoxInput]
 WPSOutput = Union[LiteralOutput, ComplexOutput, BoundingBoxOutput]
@@ -111,6 +117,16 @@ INPUT_OTHER_LAYER_TYPES  = (QgsProcessingParameterMapLayer, QgsProcessingParamet
 
 INPUT_LAYER_TYPES = INPUT_VECTOR_LAYER_TYPES + INPUT_RASTER_LAYER_TYPES + INPUT_OTHER_LAYER_TYPES
 
+# Sets for fast exact type checks
+_OUTPUT_LAYER_TYPE_SET = frozenset(OUTPUT_LAYER_TYPES)
+_INPUT_LAYER_TYPE_SET  = frozenset(INPUT_LAYER_TYPES)
+
+
+def _is_type_of( obj: Any, type_set: FrozenSet[type], types: Tuple[type,...] ) -> bool:
+    """ Check exact type first, fallback to subclasses check
+    """
+    return type(obj) in type_set or isinstance(obj, types)
+
 # Map processing source types to string
 SourceTypes = {
     QgsProcessing.TypeMapLayer: 'TypeMapLayer',
@@ -123,6 +139,53 @@ SourceTypes = {
     QgsProcessing.TypeVector: 'TypeVector',
 }
 
+@lru_cache(maxsize=64)
+def _datatypes_meta( datatypes: Tuple[int,...] ) -> str:
+    """ Return source types metadata string 
+    """
+    return sys.intern(','.join(SourceTypes[dtyp] for dtyp in datatypes))
+
+
+# Metadata keys
+MD_TYPE       = sys.intern('processing:type')
+MD_EXTENSION  = sys.intern('processing:extension')
+MD_DATATYPE   = sys.intern('processing:dataType')
+MD_DATATYPES  = sys.intern('processing:dataTypes')
+MD_FORMAT     = sys.intern('processing:format')
+MD_PARENT_LAYER_PARAMETER = sys.intern('processing:parentLayerParameterName')
+
+# Snapshot of known mimetypes
+# Do not call mimetypes.init() again: pyqgiswps.inout.formats has
+# already initialized the mimetypes module with our own formats
+_MIME = dict(mimetypes.types_map)
+
+_HTML_MIME = _MIME['.html']
+
+# Formats descriptors
+_WMS  = Format("application/x-ogc-wms")
+_WFS  = Format("application/x-ogc-wfs")
+_WCS  = Format("application/x-ogc-wcs")
+_HTML = Format(_HTML_MIME)
+
+_GEOJSON = Format.from_definition(FORMATS.GEOJSON)
+_GML     = Format.from_definition(FORMATS.GML)
+
+_POINT_FORMATS = (_GEOJSON, _GML)
+
+
+@lru_cache(maxsize=256)
+def _mime_for_ext( ext: str ) -> str:
+    """ Return the mimetype for the file extension
+
+        Extension may be given with or without the leading dot.
+        Return None if the extension is unknown.
+    """
+    ext = ext.lower()
+    if not ext.startswith('.'):
+        ext = '.' + ext
+    return _MIME.get(ext)
+
+
 class ProcessingTypeParseError(Exception):
     pass
 
@@ -133,101 +196,236 @@ class ProcessingOutputTypeNotSupported(ProcessingTypeParseError):
     pass
 
 
+_FLAG_OPTIONAL = int(QgsProcessingParameterDefinition.FlagOptional)
+
+
 def _is_optional( param: QgsProcessingParameterDefinition ) -> bool:
-    return (int(param.flags()) & QgsProcessingParameterDefinition.FlagOptional) !=0
+    return (int(param.flags()) & _FLAG_OPTIONAL) != 0
+
+
+# ==================
+# Definitions cache
+# ==================
+
+# Parsed definitions are stored as records so that
+# a fresh WPS input/output is built on each lookup:
+# inputs are stored as input specifications and outputs
+# as (class, kwargs).
+# Records are never deep copied: values like defaults may be
+# qgis objects which cannot be copied, only the lists are
+# copied when building a new WPS input/output.
+# Records do not depend on the project: allowed values for layers
+# are resolved from the project layers snapshot on each build.
+# Records are keyed by the create context since algorithms
+# may define their parameters from it, and by the timestamp of
+# the cached map project so that definitions are parsed again
+# once the project has been reloaded.
+DEFINITIONS_CACHE_SIZE = 1024
+
+_definitions_cache = lrucache(DEFINITIONS_CACHE_SIZE)
+
+
+def _context_key( context: MapContext ) -> Tuple:
+    """ Return a cache key for the create context and the map project
+    """
+    if context is None:
+        return None
+    return (tuple(sorted((k, str(v)) for k,v in context.create_context.items())),
+            context.project_timestamp())
+
+
+def _cached_definition( key: Tuple, parse ) -> Any:
+    """ Return the cached definition record
+
+        :param parse: parser returning the record to cache
+    """
+    try:
+        return _definitions_cache[key]
+    except KeyError:
+        record = _definitions_cache[key] = parse()
+        return record
+
+
+def _output_from_record( record: Tuple[type, Mapping[str,Any]] ) -> WPSOutput:
+    """ Build a new WPS output from a (class, kwargs) record
+    """
+    cls, kwargs = record
+    kwargs = dict(kwargs)
+    formats = kwargs.get('supported_formats')
+    if formats is not None:
+        kwargs['supported_formats'] = list(formats)
+    return cls(**kwargs)
 
 # ==================
 # Inputs converters
 # ==================
 
-def parse_literal_input( param: QgsProcessingParameterDefinition, kwargs ) -> LiteralInput:
-    """ Convert processing input to Literal Input 
+class _InputSpec:
+    """ Input definition record
+
+        Input parsers fill the record and return the WPS input class,
+        the input is then built with `cls.from_spec(spec)`
     """
-    typ = param.type()
+    __slots__ = ('identifier','title','abstract','metadata','data_type','default',
+                 'min_occurs','max_occurs','allowed_values','supported_formats','crss','cls',
+                 'layers_mask','multiple_layers')
+
+    def __init__(self, identifier: str, title: str, abstract: str, metadata: Tuple[Metadata,...],
+                 default: Any=None ) -> None:
+        self.identifier = identifier
+        self.title = title
+        self.abstract = abstract
+        self.metadata = metadata
+        self.data_type = None
+        self.default = default
+        self.min_occurs = 1
+        self.max_occurs = 1
+        self.allowed_values = None
+        self.supported_formats = None
+        self.crss = None
+        self.cls = None
+        # Layers datatypes mask, None if the input is not a layer
+        self.layers_mask = None
+        self.multiple_layers = False
+
+    def copy(self) -> '_InputSpec':
+        """ Return a copy of the spec
+
+            Lists are copied, other values are shared
+        """
+        spec = _InputSpec.__new__(_InputSpec)
+        for name in _InputSpec.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                value = list(value)
+            setattr(spec, name, value)
+        return spec
+
+
+_NUMBER_TYPE_MAP = {
+    QgsProcessingParameterNumber.Double : 'float',
+    QgsProcessingParameterNumber.Integer: 'integer',
+}
 
-    if typ == 'string':
-        kwargs['data_type'] = 'string'
-    elif typ == 'boolean':
-        kwargs['data_type'] = 'boolean'
-    elif typ == 'enum':
-        options = param.options()
-        kwargs['data_type'] = 'string'
-        kwargs['allowed_values'] = options
-        kwargs['max_occurs'] = len(options) if param.allowMultiple() else 1
-        default_value = param.defaultValue()
-        if default_value is not None:
-            # XXX Values for processing enum are indices
-            if isinstance(default_value, int): 
-                kwargs['default'] = options[default_value]
-            elif isinstance(default_value, list):
-                kwargs['default'] = options[default_value[0]]
-            else:
-                raise InvalidParameterValue('Unsupported default value: %s' % default_value)
-    elif typ == 'number':
-        kwargs['data_type'] = { QgsProcessingParameterNumber.Double :'float',
-                                QgsProcessingParameterNumber.Integer:'integer'
-                               }[param.dataType()]
-        kwargs['allowed_values'] = [(param.minimum(),param.maximum())]
-    elif typ =='field':
-        kwargs['data_type'] = 'string'
-        kwargs['metadata'].append(Metadata('processing:parentLayerParameterName',
-                param.parentLayerParameterName()))
-        kwargs['metadata'].append(Metadata('processing:dataType',{
-                QgsProcessingParameterField.Any: 'Any',
-                QgsProcessingParameterField.Numeric: 'Numeric',
-                QgsProcessingParameterField.String: 'String',
-                QgsProcessingParameterField.DateTime: 'DateTime'
-            }[param.dataType()]))
-    elif typ =='crs':
-        kwargs['data_type'] = 'string'
-    elif typ == 'band':
-        kwargs['data_type'] = 'nonNegativeInteger'
-    else:
+_FIELD_TYPE_MAP = {
+    QgsProcessingParameterField.Any: 'Any',
+    QgsProcessingParameterField.Numeric: 'Numeric',
+    QgsProcessingParameterField.String: 'String',
+    QgsProcessingParameterField.DateTime: 'DateTime',
+}
+
+
+def _parse_literal_string( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = 'string'
+
+
+def _parse_literal_boolean( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = 'boolean'
+
+
+def _parse_literal_enum( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    options = param.options()
+    spec.data_type = 'string'
+    spec.allowed_values = options
+    spec.max_occurs = len(options) if param.allowMultiple() else 1
+    default_value = param.defaultValue()
+    if default_value is not None:
+        # XXX Values for processing enum are indices
+        if isinstance(default_value, int): 
+            spec.default = options[default_value]
+        elif isinstance(default_value, list):
+            spec.default = options[default_value[0]]
+        else:
+            raise InvalidParameterValue('Unsupported default value: %s' % default_value)
+
+
+def _parse_literal_number( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = _NUMBER_TYPE_MAP[param.dataType()]
+    spec.allowed_values = [(param.minimum(),param.maximum())]
+
+
+def _parse_literal_field( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = 'string'
+    spec.metadata += (
+        Metadata(MD_PARENT_LAYER_PARAMETER, param.parentLayerParameterName()),
+        Metadata(MD_DATATYPE, _FIELD_TYPE_MAP[param.dataType()]),
+    )
+
+
+def _parse_literal_crs( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = 'string'
+
+
+def _parse_literal_band( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
+    spec.data_type = 'nonNegativeInteger'
+
+
+# Literal parsers by processing type
+_LITERAL_HANDLERS = {
+    'string' : _parse_literal_string,
+    'boolean': _parse_literal_boolean,
+    'enum'   : _parse_literal_enum,
+    'number' : _parse_literal_number,
+    'field'  : _parse_literal_field,
+    'crs'    : _parse_literal_crs,
+    'band'   : _parse_literal_band,
+}
+
+
+def parse_literal_input( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> Type[LiteralInput]:
+    """ Convert processing input to Literal Input 
+    """
+    handler = _LITERAL_HANDLERS.get(param.type())
+    if handler is None:
         return None
 
-    return LiteralInput(**kwargs)
+    handler(param, spec)
+    return LiteralInput
 
 
-def parse_file_input( param: QgsProcessingParameterDefinition, kwargs) -> Union[LiteralInput,ComplexInput]:
+def parse_file_input( param: QgsProcessingParameterDefinition,
+                      spec: _InputSpec ) -> Type[Union[LiteralInput,ComplexInput]]:
     """ Convert processing input to File Input 
     """
     typ = param.type()
     if typ == 'file':
         if param.behavior() == QgsProcessingParameterFile.Folder:
-            kwargs['data_type'] = 'string'
-            return LiteralInput(**kwargs)
+            spec.data_type = 'string'
+            return LiteralInput
         ext = param.extension()
         if ext:
-            mime = mimetypes.types_map.get(param.extension())
+            mime = _mime_for_ext(ext)
             if mime is not None:
-                kwargs['supported_formats'] = [Format(mime)]
-            kwargs['metadata'].append(Metadata('processing:extension',param.extension()))
-        return ComplexInput(**kwargs)
+                spec.supported_formats = [Format(mime)]
+            spec.metadata += (Metadata(MD_EXTENSION,ext),)
+        return ComplexInput
     elif typ == 'fileDestination':
-        extension = '.'+param.defaultFileExtension()
-        kwargs['data_type'] = 'string'
-        kwargs['metadata'].append(Metadata('processing:format', mimetypes.types_map.get(extension,'')))
-        return LiteralInput(**kwargs)
+        spec.data_type = 'string'
+        spec.metadata += (Metadata(MD_FORMAT, _mime_for_ext(param.defaultFileExtension()) or ''),)
+        return LiteralInput
     elif typ == 'folderDestination':
-        kwargs['data_type'] = 'string'
-        return LiteralInput(**kwargs)
+        spec.data_type = 'string'
+        return LiteralInput
 
 
-def parse_metadata( param: QgsProcessingParameterDefinition, kwargs ) -> None:
+def parse_metadata( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> None:
     """ Parse freeform metadata
     """
-    kwargs['metadata'].extend(Metadata('processing:meta:%s' % k, str(v)) for k,v in param.metadata().items())
+    md = param.metadata()
+    if not md:
+        return
+    spec.metadata += [Metadata(f'processing:meta:{k}', str(v)) for k,v in md.items()]
 
 
-def parse_allowed_layers(param: QgsProcessingParameterDefinition, kwargs, context: MapContext) -> None:
-    """ Find candidate layers according to datatypes
+def parse_allowed_layers(param: QgsProcessingParameterDefinition, spec: _InputSpec) -> None:
+    """ Set layers datatypes used for finding candidate layers
     """
     typ = param.type()
 
     if typ == 'multilayer':
         num_inputs = param.minimumNumberInputs();
-        kwargs['min_occurs'] = num_inputs if num_inputs >= 1 else 0
-        kwargs['max_occurs'] = 20 # XXX arbitrary number
+        spec.min_occurs = num_inputs if num_inputs >= 1 else 0
+        spec.max_occurs = 20 # XXX arbitrary number
 
     datatypes = []
     if isinstance(param, QgsProcessingParameterLimitedDataTypes):
@@ -243,91 +441,129 @@ def parse_allowed_layers(param: QgsProcessingParameterDefinition, kwargs, contex
         else:
             datatypes = [QgsProcessing.TypeMapLayer]
 
-    kwargs['metadata'].append(Metadata('processing:dataTypes', ','.join(SourceTypes[dtyp] for dtyp in datatypes)))
+    spec.metadata += (Metadata(MD_DATATYPES, _datatypes_meta(tuple(int(d) for d in datatypes))),)
+
+    spec.layers_mask = datatypes_mask(datatypes)
+    spec.multiple_layers = typ == 'multilayer'
 
-    # Nothing to do is there is no context
-    if context is None:
-        return
 
-    project = context.project()
-    def _is_allowed(lyr):
-        if lyr.type() == QgsMapLayer.VectorLayer:
-            geomtype = lyr.geometryType()
-            return (geomtype == QgsWkbTypes.PointGeometry and QgsProcessing.TypeVectorPoint in datatypes) \
-            or (geomtype == QgsWkbTypes.LineGeometry      and QgsProcessing.TypeVectorLine in datatypes)  \
-            or (geomtype == QgsWkbTypes.PolygonGeometry   and QgsProcessing.TypeVectorPolygon in datatypes) \
-            or QgsProcessing.TypeVectorAnyGeometry in datatypes \
-            or QgsProcessing.TypeVector in datatypes \
-            or QgsProcessing.TypeMapLayer in datatypes
-        elif lyr.type() == QgsMapLayer.RasterLayer: 
-            return QgsProcessing.TypeRaster in datatypes \
-                or QgsProcessing.TypeMapLayer in datatypes
-        return False
-        
-    kwargs['allowed_values'] = [lyr.name() for lyr in project.mapLayers().values() if _is_allowed(lyr)]
+def _resolve_allowed_layers( spec: _InputSpec, context: MapContext ) -> None:
+    """ Find candidate layers according to datatypes
+    """
+    spec.allowed_values = context.project_layers().allowed_layer_names(spec.layers_mask)
   
     # Set max occurs accordingly to 
-    if typ == 'multilayer':
-        kwargs['max_occurs'] = len(kwargs['allowed_values'])
+    if spec.multiple_layers:
+        spec.max_occurs = len(spec.allowed_values)
 
 
-def parse_layer_input(param: QgsProcessingParameterDefinition, kwargs,
-                      context: MapContext = None) -> LiteralInput:
+def parse_layer_input(param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> Type[LiteralInput]:
     """ Layers input are passed as layer name
 
         We treat layer destination the same as input since they refer to
         layers ids in qgisProject
     """
-    if isinstance(param, INPUT_LAYER_TYPES):
-        kwargs['data_type'] = 'string'
-        parse_allowed_layers(param, kwargs, context)
+    if _is_type_of(param, _INPUT_LAYER_TYPE_SET, INPUT_LAYER_TYPES):
+        spec.data_type = 'string'
+        parse_allowed_layers(param, spec)
     elif isinstance(param, QgsProcessingParameterRasterDestination):
-        kwargs['data_type'] = 'string'
-        kwargs['metadata'].append(Metadata('processing:extension',param.defaultFileExtension()))
+        spec.data_type = 'string'
+        spec.metadata += (Metadata(MD_EXTENSION,param.defaultFileExtension()),)
     elif isinstance(param, (QgsProcessingParameterVectorDestination, QgsProcessingParameterFeatureSink)):
-        kwargs['data_type'] = 'string'
-        kwargs['metadata'].append(Metadata('processing:dataType' , str(param.dataType())))
-        kwargs['metadata'].append(Metadata('processing:extension', param.defaultFileExtension()))
+        spec.data_type = 'string'
+        spec.metadata += (
+            Metadata(MD_DATATYPE , str(param.dataType())),
+            Metadata(MD_EXTENSION, param.defaultFileExtension()),
+        )
     else:
         return None
 
-    return LiteralInput(**kwargs)
+    return LiteralInput
 
 
-def parse_extent_input( param: QgsProcessingParameterDefinition, kwargs ) -> BoundingBoxInput:
+def parse_extent_input( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> Type[BoundingBoxInput]:
     """ Convert extent processing input to bounding box input"
     """
     typ = param.type()
     if typ == "extent":
        # XXX This is the default, do not presume anything
        # about effective crs at compute time
-       kwargs['crss'] = ['EPSG:4326']
-       return BoundingBoxInput(**kwargs)
+       spec.crss = ['EPSG:4326']
+       return BoundingBoxInput
 
 
-def parse_point_input( param: QgsProcessingParameterDefinition, kwargs) -> ComplexInput:
+def parse_point_input( param: QgsProcessingParameterDefinition, spec: _InputSpec ) -> Type[ComplexInput]:
     """ Convert processing point input to complex input
     """
     if isinstance(param, QgsProcessingParameterPoint):
-        kwargs['supported_formats'] = [Format.from_definition(FORMATS.GEOJSON),
-                                       Format.from_definition(FORMATS.GML)]
-        return ComplexInput(**kwargs)
-       
+        spec.supported_formats = list(_POINT_FORMATS)
+        return ComplexInput
+
+
+# Input parsers by processing parameter type
+_INPUT_HANDLERS = {
+    **{ typ: parse_literal_input for typ in _LITERAL_HANDLERS },
+    'extent' : parse_extent_input,
+    'file'   : parse_file_input,
+    'fileDestination'  : parse_file_input,
+    'folderDestination': parse_file_input,
+}
+
+# Input parsers by parameter class
+_INPUT_HANDLERS_BY_CLASS = { cls: parse_layer_input for cls in INPUT_LAYER_TYPES + DESTINATION_LAYER_TYPES }
+_INPUT_HANDLERS_BY_CLASS[QgsProcessingParameterPoint] = parse_point_input
+
+
+def _find_handler( definition, handlers, handlers_by_class ):
+    """ Return the parser for the given definition
+
+        Lookup by exact class first, then by processing type. 
+        Fallback to subclass checks for derived definition classes.
+    """
+    handler = handlers_by_class.get(type(definition)) or handlers.get(definition.type())
+    if handler is None:
+        handler = next((h for cls,h in handlers_by_class.items() if isinstance(definition, cls)), None)
+    return handler
+
 
 def parse_input_definition( param: QgsProcessingParameterDefinition, alg: QgsProcessingAlgorithm=None,  
                             context: MapContext=None ) -> WPSInput:
     """ Create WPS input from QgsProcessingParamDefinition
 
+        Parsed definitions are cached by algorithm
+
+        Allowed values for layer inputs are resolved from the
+        context project layers if a context is given.
+
         see https://qgis.org/api/qgsprocessingparameters_8h_source.html#l01312
     """
-    kwargs = {
-        'identifier': param.name() ,
-        'title'     : param.name().replace('_',' '),
-        'abstract'  : param.description(),
-        'metadata'  : [
-            Metadata('processing:type',param.type()),
-        ]
-    }
+    if alg is None:
+        spec = _parse_input_definition(param)
+    else:
+        spec = _cached_definition(('input', alg.id(), param.name(), _context_key(context)),
+                                  partial(_parse_input_definition, param))
+    return _input_from_spec(spec, context)
+
+
+def _input_from_spec( spec: _InputSpec, context: MapContext=None ) -> WPSInput:
+    """ Build a new WPS input from the input spec
+
+        Allowed values for layers are resolved only if a context is given,
+        so that the project is not loaded for non layer inputs.
+    """
+    spec = spec.copy()
+    if context is not None and spec.layers_mask is not None:
+        _resolve_allowed_layers(spec, context)
+    return spec.cls.from_spec(spec)
+
+
+def _parse_input_definition( param: QgsProcessingParameterDefinition ) -> _InputSpec:
+    """ Parse WPS input spec from QgsProcessingParamDefinition
+    """
+    # Metadata are accumulated as tuple and
+    # converted to list once all metadata are collected
+    spec = _InputSpec(param.name(), param.name().replace('_',' '), param.description(),
+                      (Metadata(MD_TYPE,param.type()),))
 
     # Handle defaultValue
     # XXX In some case QVariant are 
@@ -338,30 +574,29 @@ def parse_input_definition( param: QgsProcessingParameterDefinition, alg: QgsPro
     if isinstance(defaultValue, QVariant):
         defaultValue = None if defaultValue.isNull() else defaultValue.value()
 
-    kwargs['default'] = defaultValue
+    spec.default = defaultValue
 
     # Check for optional flags
     if _is_optional(param):
-        kwargs['min_occurs'] = 0
-
-    inp = parse_literal_input(param,kwargs) \
-            or parse_layer_input(param,kwargs, context) \
-            or parse_extent_input(param, kwargs) \
-            or parse_file_input(param, kwargs) \
-            or parse_point_input(param, kwargs)
-    if inp is None:
+        spec.min_occurs = 0
+
+    handler = _find_handler(param, _INPUT_HANDLERS, _INPUT_HANDLERS_BY_CLASS)
+    spec.cls = handler(param, spec) if handler else None
+    if spec.cls is None:
         raise ProcessingInputTypeNotSupported("%s:'%s'" %(type(param),param.type()))
 
-    parse_metadata(param, kwargs)
+    spec.metadata = list(spec.metadata)
+    parse_metadata(param, spec)
 
-    return inp
+    return spec
 
 
 # ==================
 # Output converters
 # ==================
 
-def parse_literal_output( outdef: QgsProcessingOutputDefinition, kwargs ) -> LiteralOutput:
+def parse_literal_output( outdef: QgsProcessingOutputDefinition, kwargs,
+                          alg: QgsProcessingAlgorithm=None ) -> Type[LiteralOutput]:
     """
     """
     typ = outdef.type()
@@ -372,33 +607,29 @@ def parse_literal_output( outdef: QgsProcessingOutputDefinition, kwargs ) -> Lit
     else:
         return None
 
-    return LiteralOutput(**kwargs)
+    return LiteralOutput
 
 
-def parse_layer_output( outdef: QgsProcessingOutputDefinition, kwargs ) -> ComplexOutput:
+def parse_layer_output( outdef: QgsProcessingOutputDefinition, kwargs,
+                        alg: QgsProcessingAlgorithm=None ) -> Type[ComplexOutput]:
     """ Parse layer output
 
         A layer output is merged to a qgis project, we return
         the wms uri associated to the project
     """
-    if isinstance(outdef, OUTPUT_LAYER_TYPES ):
+    if _is_type_of(outdef, _OUTPUT_LAYER_TYPE_SET, OUTPUT_LAYER_TYPES):
+        kwargs['as_reference'] = True
         if isinstance(outdef, QgsProcessingOutputVectorLayer):
-            return ComplexOutput(supported_formats=[
-                        Format("application/x-ogc-wms"),
-                        Format("application/x-ogc-wfs")
-                    ], as_reference=True, **kwargs)
+            kwargs['supported_formats'] = [_WMS, _WFS]
         elif isinstance(outdef, QgsProcessingOutputRasterLayer):
-            return ComplexOutput(supported_formats=[
-                        Format("application/x-ogc-wms"),
-                        Format("application/x-ogc-wcs")
-                    ], as_reference=True, **kwargs)
+            kwargs['supported_formats'] = [_WMS, _WCS]
         else:
-            return ComplexOutput(supported_formats=[Format("application/x-ogc-wms")], 
-                                 as_reference=True, **kwargs)
+            kwargs['supported_formats'] = [_WMS]
+        return ComplexOutput
 
 
 def parse_file_output( outdef: QgsProcessingOutputDefinition, kwargs, 
-                       alg: QgsProcessingAlgorithm=None ) -> ComplexOutput:
+                       alg: QgsProcessingAlgorithm=None ) -> Type[ComplexOutput]:
     """ Parse file output definition
 
         QgsProcessingOutputDefinition metadata will be checked to get 
@@ -409,8 +640,8 @@ def parse_file_output( outdef: QgsProcessingOutputDefinition, kwargs,
     """
     as_reference = confservice.getboolean('server','outputfile_as_reference')
     if isinstance(outdef, QgsProcessingOutputHtml):
-        mime = mimetypes.types_map.get('.html')
-        return ComplexOutput(supported_formats=[Format(mime)],**kwargs)
+        kwargs['supported_formats'] = [_HTML]
+        return ComplexOutput
     elif isinstance(outdef, QgsProcessingOutputFile):
         # Try to get a corresponding inputFileDefinition
         # See https://qgis.org/pyqgis/master/core/QgsProcessingParameterFileDestination.html
@@ -418,12 +649,30 @@ def parse_file_output( outdef: QgsProcessingOutputDefinition, kwargs,
         if alg:
             inputdef = alg.parameterDefinition(outdef.name())
             if isinstance(inputdef, QgsProcessingParameterFileDestination):
-                mime = mimetypes.types_map.get("."+inputdef.defaultFileExtension())
+                mime = _mime_for_ext(inputdef.defaultFileExtension())
                 as_reference = inputdef.metadata().get('wps:as_reference',as_reference)
         if mime is None:
             LOGGER.warning("Cannot set file type for output %s", outdef.name())
             mime = "application/octet-stream"
-        return ComplexOutput(supported_formats=[Format(mime)], as_reference=as_reference, **kwargs)
+        kwargs['supported_formats'] = [Format(mime)]
+        kwargs['as_reference'] = as_reference
+        return ComplexOutput
+
+
+# Output parsers by processing output type
+_OUTPUT_HANDLERS = {
+    'outputString': parse_literal_output,
+    'outputNumber': parse_literal_output,
+    'outputVector': parse_layer_output,
+    'outputRaster': parse_layer_output,
+    'outputHtml'  : parse_file_output,
+    'outputFile'  : parse_file_output,
+}
+
+# Output parsers by output class
+_OUTPUT_HANDLERS_BY_CLASS = { cls: parse_layer_output for cls in OUTPUT_LAYER_TYPES }
+_OUTPUT_HANDLERS_BY_CLASS[QgsProcessingOutputHtml] = parse_file_output
+_OUTPUT_HANDLERS_BY_CLASS[QgsProcessingOutputFile] = parse_file_output
 
 
 def parse_output_definition( outdef: QgsProcessingOutputDefinition, alg: QgsProcessingAlgorithm=None, 
@@ -433,6 +682,22 @@ def parse_output_definition( outdef: QgsProcessingOutputDefinition, alg: QgsProc
         XXX Create more QgsProcessingOutputDefinition for handling:
             - output matrix
             - output json vector
+
+        Parsed definitions are cached by algorithm
+    """
+    if alg is None:
+        record = _parse_output_definition(outdef)
+    else:
+        record = _cached_definition(('output', alg.id(), outdef.name(), _context_key(context)),
+                                    partial(_parse_output_definition, outdef, alg))
+    return _output_from_record(record)
+
+
+def _parse_output_definition( outdef: QgsProcessingOutputDefinition, 
+                              alg: QgsProcessingAlgorithm=None ) -> Tuple[WPSOutput, Mapping[str,Any]]:
+    """ Parse WPS output from QgsProcessingOutputDefinition
+
+        :return: A tuple (class, kwargs)
     """
     kwargs = {
         'identifier': outdef.name() ,
@@ -440,19 +705,104 @@ def parse_output_definition( outdef: QgsProcessingOutputDefinition, alg: QgsProc
         'abstract'  : outdef.description(),
     }
 
-    output = parse_literal_output( outdef, kwargs) \
-            or parse_layer_output( outdef, kwargs )\
-            or parse_file_output( outdef, kwargs, alg )
-    if output is None:
+    handler = _find_handler(outdef, _OUTPUT_HANDLERS, _OUTPUT_HANDLERS_BY_CLASS)
+    cls = handler(outdef, kwargs, alg) if handler else None
+    if cls is None:
         raise ProcessingOutputTypeNotSupported(outdef.type())
 
-    return output
+    return cls, kwargs
+
+
+def parse_algorithm_definitions( alg: QgsProcessingAlgorithm,
+                                 context: MapContext=None ) -> Tuple[List[WPSInput], List[WPSOutput]]:
+    """ Create WPS inputs and outputs from all the algorithm definitions
+
+        The project is only loaded if some layer inputs
+        require allowed values.
+
+        Unsupported definitions are logged and skipped.
+
+        :return: A tuple (inputs, outputs)
+    """
+    inputs = []
+    for param in alg.parameterDefinitions():
+        try:
+            inputs.append(parse_input_definition(param, alg, context))
+        except ProcessingTypeParseError as e:
+            LOGGER.error("%s: unsupported param %s", alg.id(), e)
+
+    outputs = []
+    for outdef in alg.outputDefinitions():
+        try:
+            outputs.append(parse_output_definition(outdef, alg, context))
+        except ProcessingTypeParseError as e:
+            LOGGER.error("%s: unsupported param %s", alg.id(), e)
+
+    return inputs, outputs
 
 
 # ==================================================
 # Convert input WPS values to processing inputs data
 # ==================================================
 
+def _parse_layerspec_url( layerspec: str ) -> Tuple[str, str, List[str], List[str]]:
+    """ Parse a layer specification as url
+
+        :return: A tuple (scheme, path, select, rect)
+    """
+    u  = urlparse(layerspec)
+    qs = parse_qs(u.query)
+    return u.scheme, u.path, qs.get('select',[]), qs.get('rect',[])
+
+
+def _fast_parse_layerspec( layerspec: str ) -> Tuple[str, str, List[str], List[str]]:
+    """ Parse a layer specification
+
+        Handle the layer specification grammar without building a full url
+        parse result: `[layer:|file:]<path>[?select=<expression>&rect=<xmin,ymin,xmax,ymax>]`.
+
+        Fallback to url parsing for anything else.
+
+        :return: A tuple (scheme, path, select, rect)
+    """
+    if '#' in layerspec:
+        return _parse_layerspec_url(layerspec)
+
+    path, _, query = layerspec.partition('?')
+    scheme, sep, rest = path.partition(':')
+    if not sep:
+        scheme = ''
+    else:
+        scheme = scheme.lower()
+        if scheme not in ('file', 'layer') or rest.startswith('//'):
+            return _parse_layerspec_url(layerspec)
+        path = rest
+
+    feat_requests = []
+    feat_rects    = []
+    if query:
+        for field in query.split('&'):
+            name, sep, value = field.partition('=')
+            if not value:
+                continue
+            if name == 'select':
+                feat_requests.append(unquote_plus(value))
+            elif name == 'rect':
+                feat_rects.append(unquote_plus(value))
+
+    return scheme, path, feat_requests, feat_rects
+
+
+def _parse_rect( value: str ) -> QgsRectangle:
+    """ Parse 'xmin,ymin,xmax,ymax' selection rectangle
+    """
+    try:
+        xmin, ymin, xmax, ymax = (float(v) for v in value.split(','))
+    except ValueError:
+        raise InvalidParameterValue("Invalid rect '%s': expecting 'xmin,ymin,xmax,ymax'" % value)
+    return QgsRectangle(xmin, ymin, xmax, ymax)
+
+
 def parse_layer_spec( layerspec: str, context: ProcessingContext, allow_selection: bool=False ) -> Tuple[str,bool]:
     """ Parse a layer specification
 
@@ -461,36 +811,33 @@ def parse_layer_spec( layerspec: str, context: ProcessingContext, allow_selectio
 
         :return: A tuple (path, bool)
     """
-    u = urlparse(layerspec)
-    p = u.path
-    if u.scheme == 'file':
+    scheme, p, feat_requests, feat_rects = _fast_parse_layerspec(layerspec)
+    path = p
+    if scheme == 'file':
         p = context.resolve_path(p)
-    elif u.scheme and u.scheme != 'layer':
+    elif scheme and scheme != 'layer':
         raise InvalidParameterValue("Bad scheme: %s" % layerspec)
 
     if not allow_selection:
         return p, False
 
     has_selection = False
-    qs = parse_qs(u.query)
-    feat_requests = qs.get('select',[])
-    feat_rects    = qs.get('rect',[])
     if feat_rects or feat_requests:
         has_selection = True
-        layer = context.getMapLayer(p)
+        layer = QgsProcessingUtils.mapLayerFromString(str(p), context)
         if not layer:
-            LOGGER.error("No layer path for url %s", u)
-            raise InvalidParameterValue("No layer '%s' found" % u.path, )
+            LOGGER.error("No layer path for url %s", layerspec)
+            raise InvalidParameterValue("No layer '%s' found" % path, )
 
         if layer.type() != QgsMapLayer.VectorLayer:
             LOGGER.warning("Can apply selection only to vector layer")
         else:
+            rect = _parse_rect(feat_rects[-1]) if feat_rects else None
             behavior = QgsVectorLayer.SetSelection
             try:
-                LOGGER.debug("Applying features selection: %s", qs)
+                LOGGER.debug("Applying features selection: select=%s, rect=%s", feat_requests, feat_rects)
                 # Apply filter rect first
-                if feat_rects:
-                    rect = QgsRectangle(feat_rects[-1].split(',')[:4])
+                if rect is not None:
                     layer.selectByRect(rect, behavior=behavior)
                     behavior = QgsVectorLayer.IntersectSelection
                 # Selection by expressions
@@ -520,113 +867,220 @@ def input_to_file( inp: ComplexInput, param: QgsProcessingParameterFile,
     outputfile = (Path(context.workdir)/param.name()).with_suffix(param.extension())
     inp.download_ref(outputfile)
 
-    # Save data
-    LOGGER.debug("Saving input data as %s", outputfile.as_posix())
-    with outputfile.open('wb') as f:
-        data = inp.data
-        if isinstance(data,str):
-            data = data.encode()
-        f.write(data)
+    # Data has been written by download_ref unless 
+    # the input is already a file: let the os copy it
+    source = inp.file
+    if os.path.abspath(source) != os.path.abspath(outputfile):
+        LOGGER.debug("Saving input data as %s", outputfile.as_posix())
+        shutil.copyfile(source, outputfile)
     # Return base name as input file in located in workdir
     return outputfile.name
 
 
+def _as_point( geom: QgsGeometry ) -> QgsPointXY:
+    """ Return point from geometry
+    """
+    if geom.type() == QgsWkbTypes.PointGeometry and not geom.isMultipart():
+        return geom.asPoint()
+    return geom.centroid().asPoint()
+
+
+def _geojson_to_point( data: str ) -> Union[QgsGeometry, QgsReferencedPointXY]:
+    """ Handle GeoJSON point 
+
+        Read coordinates and crs directly from json.
+        Return None if data is not a GeoJSON point.
+
+        Z coordinate is kept only for points without crs
+        since referenced points are 2D.
+    """
+    try:
+        obj = json.loads(data)
+        if obj.get('type') != 'Point':
+            return None
+        coords = obj['coordinates']
+        x, y = float(coords[0]), float(coords[1])
+        z = float(coords[2]) if len(coords) > 2 else None
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+        return None
+
+    crs = obj.get('crs')
+    if crs:
+        srs = QgsCoordinateReferenceSystem()
+        try:
+            valid = srs.createFromUserInput(crs['properties']['name'])
+        except (TypeError, KeyError):
+            valid = False
+        if valid:
+            return QgsReferencedPointXY(QgsPointXY(x, y), srs)
+        LOGGER.warning("Invalid GeoJSON crs: %s", crs)
+
+    if z is not None:
+        return QgsGeometry(QgsPoint(x, y, z))
+    return QgsGeometry.fromPointXY(QgsPointXY(x, y))
+
+
 def input_to_point( inp: WPSInput ):
     """ Handle point from complex input
     """
     data_format = inp.data_format
     geom = None
     if data_format.mime_type == FORMATS.GEOJSON.mime_type:
+        point = _geojson_to_point(inp.data)
+        if point is not None:
+            return point
         geom = ogr.CreateGeometryFromJson(inp.data)
     elif data_format.mime_type == FORMATS.GML.mime_type:
         geom = ogr.CreateGeometryFromGML(inp.data)
  
     if geom:
         srs  = geom.GetSpatialReference()
-        geom = QgsGeometry.fromWkt(geom.ExportToWkt())
+        wkb  = geom.ExportToIsoWkb()
+        geom = QgsGeometry()
+        geom.fromWkb(wkb)
         if srs:
             srs = QgsCoordinateReferenceSystem.fromWkt(srs.ExportToWkt())
         if srs and srs.isValid():
-            geom = QgsReferencedPointXY( geom.centroid().asPoint(), srs )
+            geom = QgsReferencedPointXY( _as_point(geom), srs )
             
         return geom
 
     raise NoApplicableCode("Unsupported data format: %s" % data_format)
 
 
-def input_to_processing( identifier: str, inp: WPSInput, alg: QgsProcessingAlgorithm, 
-                         context: ProcessingContext ) -> Tuple[str, Any]:
-    """ Convert wps input to processing param
+def _destination_layer_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                                      context: ProcessingContext ) -> QgsProcessingOutputLayerDefinition:
+    """ Convert destination layer input
+    """
+    # Do not supports memory: layer since we are storing destination project to file
+    param.setSupportsNonFileBasedOutput(False)
+    # Enforce pushing created layers to layersToLoadOnCompletion list
+    sink = "./%s.%s" % (param.name(), param.defaultFileExtension())
+    value = QgsProcessingOutputLayerDefinition(sink, context.destination_project)
+    value.destinationName = inp[0].data
+    return value
+
+
+def _feature_source_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                                   context: ProcessingContext ) -> QgsProcessingFeatureSourceDefinition:
+    """ Convert feature source input
+    """
+    # Support feature selection
+    value, has_selection = parse_layer_spec(inp[0].data, context, allow_selection=True)
+    return QgsProcessingFeatureSourceDefinition(value, selectedFeaturesOnly=has_selection)
 
-        see https://qgis.org/api/classQgsProcessingOutputLayerDefinition.html
-        see https://qgis.org/api/qgsprocessingparameters_8cpp_source.html#L272
 
-        see ./python/plugins/processing/tools/general.py:111
-        see ./python/plugins/processing/gui/Postprocessing.py:50
-        see ./python/plugins/processing/core/Processing.py:126
+def _layer_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                          context: ProcessingContext ) -> Union[str, List[str]]:
+    """ Convert layer input
     """
-    param = alg.parameterDefinition(identifier)
+    if len(inp) > 1:
+        return [parse_layer_spec(i.data, context)[0] for i in inp]
+    value, _ = parse_layer_spec(inp[0].data, context)
+    return value
 
-    typ = param.type()
 
-    if isinstance(param, DESTINATION_LAYER_TYPES):
-        # Do not supports memory: layer since we are storing destination project to file
-        param.setSupportsNonFileBasedOutput(False)
-        # Enforce pushing created layers to layersToLoadOnCompletion list
-        sink = "./%s.%s" % (param.name(), param.defaultFileExtension())
-        value = QgsProcessingOutputLayerDefinition(sink, context.destination_project)
-        value.destinationName = inp[0].data
-
-    elif isinstance(param, QgsProcessingParameterFeatureSource):
-        # Support feature selection
-        value, has_selection = parse_layer_spec(inp[0].data, context, allow_selection=True)
-        value = QgsProcessingFeatureSourceDefinition(value, selectedFeaturesOnly=has_selection)
-
-    elif isinstance(param, INPUT_LAYER_TYPES):
-        if len(inp) > 1:
-            value = [parse_layer_spec(i.data, context)[0] for i in inp]
-        else:
-            value, _ = parse_layer_spec(inp[0].data, context)
+def _point_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                          context: ProcessingContext ) -> Union[QgsGeometry, QgsReferencedPointXY]:
+    """ Convert point input
+    """
+    return input_to_point( inp[0] )
 
-    elif isinstance(param, QgsProcessingParameterPoint):
-        value = input_to_point( inp[0] )
 
-    elif typ == 'enum':
-        # XXX Processing wants the index of the value in option list
-        if param.allowMultiple() and len(inp) > 1:
-            opts  = param.options()
-            value = [opts.index(d.data) for d in inp] 
-        else:
-            value = param.options().index(inp[0].data)
+def _enum_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                         context: ProcessingContext ) -> Union[int, List[int]]:
+    """ Convert enum input
+    """
+    # XXX Processing wants the index of the value in option list
+    if param.allowMultiple() and len(inp) > 1:
+        opts  = param.options()
+        return [opts.index(d.data) for d in inp] 
+    return param.options().index(inp[0].data)
+
 
-    elif typ == 'extent':
-        value = input_to_extent( inp[0] )
+def _extent_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                           context: ProcessingContext ) -> QgsReferencedRectangle:
+    """ Convert extent input
+    """
+    return input_to_extent( inp[0] )
 
-    elif typ == 'crs':
-        # XXX CRS may be expressed as EPSG (or QgsProperty ?)
-        value = inp[0].data
 
-    elif typ in ('fileDestination','folderDestination'):
-        # Normalize path
-        value = basename(normpath(inp[0].data))
-        if value != inp[0].data:
-            LOGGER.warning("Value for file or folder destination '%s' has been truncated from '%s' to '%s'",
-                    identifier, inp[0].data, value )
+def _crs_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                        context: ProcessingContext ) -> str:
+    """ Convert crs input
+    """
+    # XXX CRS may be expressed as EPSG (or QgsProperty ?)
+    return inp[0].data
 
-    elif typ == 'file':
-        # Handle file input
-        value = input_to_file( inp[0], param, context )
 
-    elif len(inp):
-        # Return raw value
-        value = inp[0].data
-    else:
-        # Return undefined value
-        if not _is_optional(param):
-            LOGGER.warning("Required input %s has no value", identifier)
-        value = None
+def _destination_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                                context: ProcessingContext ) -> str:
+    """ Convert file or folder destination input
+    """
+    # Normalize path
+    value = basename(normpath(inp[0].data))
+    if value != inp[0].data:
+        LOGGER.warning("Value for file or folder destination '%s' has been truncated from '%s' to '%s'",
+                param.name(), inp[0].data, value )
+    return value
+
+
+def _file_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                         context: ProcessingContext ) -> str:
+    """ Convert file input
+    """
+    return input_to_file( inp[0], param, context )
+
+
+def _value_to_processing( inp: WPSInput, param: QgsProcessingParameterDefinition,
+                          context: ProcessingContext ) -> Any:
+    """ Return the raw input value
+    """
+    if len(inp):
+        return inp[0].data
+    # Return undefined value
+    if not _is_optional(param):
+        LOGGER.warning("Required input %s has no value", param.name())
+    return None
+
+
+# Input converters by processing parameter type
+_EXEC_HANDLERS = {
+    'enum'             : _enum_to_processing,
+    'extent'           : _extent_to_processing,
+    'crs'              : _crs_to_processing,
+    'fileDestination'  : _destination_to_processing,
+    'folderDestination': _destination_to_processing,
+    'file'             : _file_to_processing,
+}
+# Other literal types take the raw value
+_EXEC_HANDLERS.update((typ, _value_to_processing) for typ in _LITERAL_HANDLERS
+                      if typ not in _EXEC_HANDLERS)
+
+# Input converters by parameter class
+# Note: insertion order matters for subclasses lookup
+_EXEC_HANDLERS_BY_CLASS = { cls: _destination_layer_to_processing for cls in DESTINATION_LAYER_TYPES }
+_EXEC_HANDLERS_BY_CLASS[QgsProcessingParameterFeatureSource] = _feature_source_to_processing
+_EXEC_HANDLERS_BY_CLASS.update((cls, _layer_to_processing) for cls in INPUT_LAYER_TYPES 
+                                if cls not in _EXEC_HANDLERS_BY_CLASS)
+_EXEC_HANDLERS_BY_CLASS[QgsProcessingParameterPoint] = _point_to_processing
+
+
+def input_to_processing( identifier: str, inp: WPSInput, alg: QgsProcessingAlgorithm, 
+                         context: ProcessingContext ) -> Tuple[str, Any]:
+    """ Convert wps input to processing param
+
+        see https://qgis.org/api/classQgsProcessingOutputLayerDefinition.html
+        see https://qgis.org/api/qgsprocessingparameters_8cpp_source.html#L272
+
+        see ./python/plugins/processing/tools/general.py:111
+        see ./python/plugins/processing/gui/Postprocessing.py:50
+        see ./python/plugins/processing/core/Processing.py:126
+    """
+    param = alg.parameterDefinition(identifier)
 
-    return param.name(), value
+    handler = _find_handler(param, _EXEC_HANDLERS, _EXEC_HANDLERS_BY_CLASS) or _value_to_processing
+    return param.name(), handler(inp, param, context)
 
 # ==================================================
 # Convert processing outputs to WPS output responses
@@ -648,15 +1102,17 @@ def processing_to_output( value: Any, outdef: QgsProcessingOutputDefinition, out
                           output_uri: str, context: ProcessingContext ) -> None:
     """ Map processing output to WPS
     """
-    if isinstance(outdef, OUTPUT_LAYER_TYPES):
+    if _is_type_of(outdef, _OUTPUT_LAYER_TYPE_SET, OUTPUT_LAYER_TYPES):
         out.output_format = "application/x-ogc-wms"
         out.url = output_uri + '&' + urlencode((('layer',value),))
     elif isinstance(outdef, QgsProcessingOutputHtml):
-        out.output_format = mimetypes.types_map['.html']
+        out.output_format = _HTML_MIME
         return to_output_file( value, out, context )
     elif isinstance(outdef, QgsProcessingOutputFile):
-        _, sfx = os.path.splitext(value)
-        mime = mimetypes.types_map.get(sfx.lower())
+        # Suffix must be in the file name part and must not be
+        # a leading dot
+        i = value.rfind('.')
+        mime = _mime_for_ext(value[i:]) if i > value.rfind('/') + 1 else None
         if mime is None:
             LOGGER.warning("Cannot get file type for output %s: %s", outdef.name(), value)
             mime = "application/octet-stream"    
@@ -23,6 +23,7 @@ from functools import partial
 from .processingio import (ProcessingTypeParseError,
                            parse_input_definition,
                            parse_output_definition,
+                           parse_algorithm_definitions,
                            input_to_processing,
                            processing_to_output)
 
@@ -272,16 +273,8 @@ class QgsProcess(WPSProcess):
 
         alg = _find_algorithm( algorithm ) if isinstance(algorithm, str) else algorithm
 
-        def _parse( parser, alg, defs ):
-            for param in defs:
-                try:
-                    yield parser(param, alg, context=context)
-                except ProcessingTypeParseError as e:
-                    LOGGER.error("%s: unsupported param %s",alg.id(),e)
-
         # Create input/output
-        inputs  = list(_parse(parse_input_definition, alg, alg.parameterDefinitions()))
-        outputs = list(_parse(parse_output_definition, alg, alg.outputDefinitions()))
+        inputs, outputs = parse_algorithm_definitions(alg, context)
 
         version = alg.version() if hasattr(alg,'versions') else _generic_version
 
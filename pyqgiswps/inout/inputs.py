@@ -50,6 +50,16 @@ class BoundingBoxInput(basic.BBoxInput):
         self.min_occurs = int(min_occurs)
         self.max_occurs = int(max_occurs)
 
+    @classmethod
+    def from_spec(cls, spec) -> 'BoundingBoxInput':
+        """ Create input from an input specification
+
+            :param spec: object holding the constructor arguments as attributes
+        """
+        return cls(spec.identifier, spec.title, spec.crss, abstract=spec.abstract,
+                   metadata=spec.metadata, min_occurs=spec.min_occurs,
+                   max_occurs=spec.max_occurs, default=spec.default)
+
     def describe_xml(self):
         """
         :return: describeprocess response xml element
@@ -148,6 +158,17 @@ class ComplexInput(basic.ComplexInput):
         self.method = ''
         self.max_size = int(0)
 
+    @classmethod
+    def from_spec(cls, spec) -> 'ComplexInput':
+        """ Create input from an input specification
+
+            :param spec: object holding the constructor arguments as attributes
+        """
+        return cls(spec.identifier, spec.title, supported_formats=spec.supported_formats,
+                   abstract=spec.abstract, metadata=spec.metadata,
+                   min_occurs=spec.min_occurs, max_occurs=spec.max_occurs,
+                   default=spec.default)
+
     def download_ref(self, filename: os.PathLike ) -> None: 
         """ Download reference/data as filename
         """
@@ -298,6 +319,21 @@ class LiteralInput(basic.LiteralInput):
         self.min_occurs = int(min_occurs)
         self.max_occurs = int(max_occurs)
 
+    @classmethod
+    def from_spec(cls, spec) -> 'LiteralInput':
+        """ Create input from an input specification
+
+            :param spec: object holding the constructor arguments as attributes,
+                         allowed_values may be None for any value
+        """
+        allowed_values = spec.allowed_values
+        if allowed_values is None:
+            allowed_values = AnyValue
+        return cls(spec.identifier, spec.title, data_type=spec.data_type,
+                   abstract=spec.abstract, metadata=spec.metadata,
+                   default=spec.default, min_occurs=spec.min_occurs,
+                   max_occurs=spec.max_occurs, allowed_values=allowed_values)
+
     def describe_xml(self):
         """Return DescribeProcess Output element
         """
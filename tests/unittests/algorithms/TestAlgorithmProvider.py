@@ -19,6 +19,7 @@ from .TestInputMultiLayer import TestInputMultiLayer
 from .TestMapContext import TestMapContext
 from .TestLongProcess import TestLongProcess
 from .TestInputFile import TestInputFile
+from .TestDefinitions import TestDefinitions
 
 class TestAlgorithmProvider(QgsProcessingProvider):
 
@@ -41,6 +42,7 @@ class TestAlgorithmProvider(QgsProcessingProvider):
                  TestMapContext(),
                  TestLongProcess(),
                  TestInputFile(),
+                 TestDefinitions(),
             ]
         except:
             traceback.print_exc()
@@ -0,0 +1,51 @@
+""" Test algorithm with qgis object defaults
+"""
+from qgis.core import (QgsProcessingParameterCrs,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingOutputString,
+                       QgsProcessingAlgorithm,
+                       QgsCoordinateReferenceSystem)
+
+
+class TestDefinitions(QgsProcessingAlgorithm):
+
+    CRS = 'CRS'
+    OPTIONS = 'OPTIONS'
+    NUMBER = 'NUMBER'
+    OUTPUT = 'OUTPUT'
+
+    def __init__(self):
+        super().__init__()
+
+    def name(self):
+        return 'testdefinitions'
+
+    def displayName(self):
+        return 'Test Definitions'
+
+    def createInstance(self, config=None):
+        """ Virtual override
+
+            see https://qgis.org/api/classQgsProcessingAlgorithm.html
+        """
+        return self.__class__()
+
+    def initAlgorithm( self, config=None ):
+        """ Virtual override
+
+            see https://qgis.org/api/classQgsProcessingAlgorithm.html
+        """
+        self.addParameter(QgsProcessingParameterCrs(self.CRS, 'Crs',
+                          defaultValue=QgsCoordinateReferenceSystem('EPSG:3857')))
+        self.addParameter(QgsProcessingParameterEnum(self.OPTIONS, 'Options', options=['a','b','c']))
+        self.addParameter(QgsProcessingParameterNumber(self.NUMBER, 'Number',
+                          type=QgsProcessingParameterNumber.Integer,
+                          minValue=1, defaultValue=10))
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT,"Output"))
+
+    def processAlgorithm(self, parameters, context, feedback):
+
+        crs = self.parameterAsCrs(parameters, self.CRS, context)
+
+        return {self.OUTPUT: crs.authid()}
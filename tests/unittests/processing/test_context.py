@@ -1,6 +1,7 @@
 """ Test parsing processing itputs to WPS inputs
 """
 import os
+import pytest
 from urllib.parse import urlparse, parse_qs, urlencode
 #from pyqgiswps.utils.qgis import setup_qgis_paths
 #setup_qgis_paths()
@@ -15,6 +16,7 @@ from pyqgiswps.inout import (LiteralInput,
                         BoundingBoxOutput)
 
 from pyqgiswps.validator.allowed_value import ALLOWEDVALUETYPE
+from pyqgiswps.exceptions import InvalidParameterValue
 from pyqgiswps.executors.processingio import(
             parse_literal_input,
             parse_layer_input,
@@ -23,8 +25,11 @@ from pyqgiswps.executors.processingio import(
             parse_literal_output,
             parse_layer_output,
             parse_output_definition,
+            parse_algorithm_definitions,
+            parse_layer_spec,
             input_to_processing,
             processing_to_output,
+            _context_key,
         )
 
 from pyqgiswps.executors.processingprocess import(
@@ -46,6 +51,8 @@ from qgis.core import (QgsProcessingParameterNumber,
                        QgsProcessingParameterRasterDestination,
                        QgsProcessingParameterFile,
                        QgsProcessingParameterField,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessing,
                        QgsProcessingUtils,
                        QgsProcessingFeedback,
                        QgsProcessingContext,
@@ -53,11 +60,12 @@ from qgis.core import (QgsProcessingParameterNumber,
                        QgsRectangle,
                        QgsCoordinateReferenceSystem,
                        QgsProject,
-                       QgsMapLayer)
+                       QgsMapLayer,
+                       QgsVectorLayer)
 
 from processing.core.Processing import Processing
 
-from pyqgiswps.executors.processingprocess import MapContext, ProcessingContext
+from pyqgiswps.executors.processingprocess import MapContext, ProcessingContext, QgsProcess
 
 
 def test_context(outputdir, data):
@@ -155,6 +163,50 @@ def test_map_vector_context(outputdir, data):
     assert allowed_values == layers
 
 
+def test_map_context_layers_updated(outputdir, data):
+    """ Test allowed layers are updated when project layers change
+    """
+    alg = _find_algorithm('pyqgiswps_test:testcopylayer')
+    context = MapContext('france_parts.qgs')
+    project = context.project()
+
+    def allowed_values():
+        inp = parse_input_definition(alg.parameterDefinition('INPUT'),alg,context)
+        return { v.value for v in inp.allowed_values }
+
+    assert allowed_values() == { 'france_parts' }
+
+    layer = QgsVectorLayer('Point?crs=EPSG:4326', 'test_points', 'memory')
+    assert layer.isValid()
+    layer_id = layer.id()
+    project.addMapLayer(layer)
+    try:
+        assert allowed_values() == { 'france_parts', 'test_points' }
+    finally:
+        project.removeMapLayer(layer_id)
+
+    assert allowed_values() == { 'france_parts' }
+
+
+def test_map_context_point_layers(outputdir, data):
+    """ Test allowed layers are restricted to the geometry type
+    """
+    param = QgsProcessingParameterFeatureSource('INPUT', 'Points', types=[QgsProcessing.TypeVectorPoint])
+    context = MapContext('france_parts.qgs')
+    project = context.project()
+
+    layer = QgsVectorLayer('Point?crs=EPSG:4326', 'test_points', 'memory')
+    assert layer.isValid()
+    layer_id = layer.id()
+    project.addMapLayer(layer)
+    try:
+        inp = parse_input_definition(param,None,context)
+        # Polygon layer france_parts is excluded
+        assert { v.value for v in inp.allowed_values } == { 'test_points' }
+    finally:
+        project.removeMapLayer(layer_id)
+
+
 def test_map_raster_context(outputdir, data):
     """ Test map context return allowed layers
     """
@@ -185,7 +237,80 @@ def test_multilayer_context(outputdir, data):
     assert allowed_values == layers
 
 
+def test_algorithm_definitions_context(outputdir, data):
+    """ Test parsing all algorithm definitions with map context
+    """
+    alg = _find_algorithm('pyqgiswps_test:testcopylayer')
+    context = MapContext('france_parts.qgs')
+    inputs, outputs = parse_algorithm_definitions(alg, context)
+
+    inputs  = { inp.identifier: inp for inp in inputs }
+    outputs = { out.identifier: out for out in outputs }
+
+    assert set(inputs)  == { p.name() for p in alg.parameterDefinitions() }
+    assert set(outputs) == { p.name() for p in alg.outputDefinitions() }
+
+    layers = { l.name() for l in context.project().mapLayers().values() if l.type() == QgsMapLayer.VectorLayer }
 
+    allowed_values = { v.value for v in inputs['INPUT'].allowed_values }
+    assert allowed_values == layers
+
+
+def test_map_context_definitions(outputdir, data):
+    """ Test definitions depending on the create context 
+    """
+    # Project is not loaded for algorithms without layer inputs
+    process = QgsProcess.createInstance('pyqgiswps_test:testmapcontext', map_uri='unknown_project.qgs')
+    inputs  = { inp.identifier: inp for inp in process.inputs }
+    assert inputs['INPUT'].default == 'unknown_project'
 
+    # Definitions are not shared between create contexts
+    process = QgsProcess.createInstance('pyqgiswps_test:testmapcontext', map_uri='france_parts.qgs')
+    inputs  = { inp.identifier: inp for inp in process.inputs }
+    assert inputs['INPUT'].default == 'france_parts'
 
 
+def test_map_context_project_updated(outputdir, data):
+    """ Test that definitions are keyed by the map project timestamp
+    """
+    context = MapContext('france_parts.qgs')
+    project = context.project()
+    key     = _context_key(context)
+    assert context.project_timestamp() is not None
+
+    path  = data.join('france_parts.qgs').strpath
+    mtime = os.stat(path).st_mtime
+    try:
+        # Force the project to be reloaded
+        os.utime(path, (mtime+10, mtime+10))
+        context = MapContext('france_parts.qgs')
+        assert context.project() is not project
+        assert _context_key(context) != key
+    finally:
+        os.utime(path, (mtime, mtime))
+
+
+def test_layer_spec_rect_selection(outputdir, data):
+    """ Test features selection from rect
+    """
+    context = ProcessingContext(outputdir.strpath, 'france_parts.qgs')
+    layer   = context.project().mapLayersByName('france_parts')[0]
+    try:
+        # Rect inside a single feature
+        path, has_selection = parse_layer_spec('layer:france_parts?rect=-4.5,48.0,-4.0,48.3', context,
+                                               allow_selection=True)
+        assert path == 'france_parts'
+        assert has_selection
+        assert layer.selectedFeatureCount() == 1
+
+        # Rect covering the whole layer
+        path, has_selection = parse_layer_spec('layer:france_parts?rect=-6,46,4,50', context,
+                                               allow_selection=True)
+        assert has_selection
+        assert layer.selectedFeatureCount() == layer.featureCount()
+
+        # Invalid rect
+        with pytest.raises(InvalidParameterValue):
+            parse_layer_spec('layer:france_parts?rect=-6,46,4', context, allow_selection=True)
+    finally:
+        layer.removeSelection()
@@ -2,6 +2,9 @@
 """
 import os
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs, urlencode
+
+from lxml import etree
 
 from pyqgiswps.utils.contexts import chdir 
 
@@ -25,6 +28,7 @@ from pyqgiswps.executors.processingio import(
             parse_literal_output,
             parse_layer_output,
             parse_output_definition,
+            parse_algorithm_definitions,
             parse_point_input,
             parse_file_input,
             input_to_processing,
@@ -33,6 +37,7 @@ from pyqgiswps.executors.processingio import(
             input_to_extent,
             input_to_file,
             _is_optional,
+            _fast_parse_layerspec,
         ) 
 
 from pyqgiswps.executors.processingprocess import(
@@ -66,6 +71,8 @@ from qgis.core import (QgsProcessing,
                        QgsReferencedRectangle,
                        QgsRectangle,
                        QgsReferencedPointXY,
+                       QgsPointXY,
+                       QgsWkbTypes,
                        QgsGeometry,
                        QgsCoordinateReferenceSystem,
                        QgsProject)
@@ -226,6 +233,30 @@ def test_file_output_mimetypes():
     output = processing_to_output('binaryfile', outdef, out, output_uri=None, context=context) 
     assert output.output_format == 'application/octet-stream'
 
+    output = processing_to_output('dir.png/binaryfile', outdef, out, output_uri=None, context=context) 
+    assert output.output_format == 'application/octet-stream'
+
+    output = processing_to_output('FILE.PNG', outdef, out, output_uri=None, context=context) 
+    assert output.output_format == 'image/png'
+
+
+def test_file_output_path():
+    """ Test file output path in workdir
+    """
+    outdef  = QgsProcessingOutputFile("OUTPUT","test output file") 
+    context = QgsProcessingContext()
+    context.workdir = "/path/to/workdir"
+
+    out = parse_output_definition(outdef)
+    out.as_reference = False
+
+    output = processing_to_output('file.png', outdef, out, output_uri=None, context=context)
+    assert output.file == '/path/to/workdir/file.png'
+
+    # Absolute paths are kept ( temporary files for example )
+    output = processing_to_output('/tmp/processing/file.png', outdef, out, output_uri=None, context=context)
+    assert output.file == '/tmp/processing/file.png'
+
 
 def test_input_title():
     param = QgsProcessingParameterNumber("Input_title",
@@ -328,3 +359,108 @@ def test_point_input_json():
     assert isinstance( value, (QgsGeometry, QgsReferencedPointXY))
 
 
+def _point_input( data_format, data ):
+    inp = parse_input_definition(QgsProcessingParameterPoint("POINT"))
+    inp.data_format = Format.from_definition(data_format)
+    inp.data = data
+    return inp
+
+
+def test_point_input_json_coordinates():
+    """ Test input point coordinates from json without crs
+    """
+    inp = _point_input(FORMATS.GEOJSON, '{"coordinates":[4.0,42.0],"type":"Point"}')
+
+    value = input_to_point( inp )
+    assert isinstance( value, QgsGeometry )
+    assert value.asPoint() == QgsPointXY(4.0, 42.0)
+
+
+def test_point_input_json_coordinates_z():
+    """ Test input point z coordinate from json without crs
+    """
+    inp = _point_input(FORMATS.GEOJSON, '{"coordinates":[4.0,42.0,10.0],"type":"Point"}')
+
+    value = input_to_point( inp )
+    assert isinstance( value, QgsGeometry )
+    point = value.constGet()
+    assert (point.x(), point.y(), point.z()) == (4.0, 42.0, 10.0)
+
+
+def test_point_input_json_crs():
+    """ Test input point coordinates and crs from json
+    """
+    inp = _point_input(FORMATS.GEOJSON, '{"coordinates":[4.0,42.0],"type":"Point",'
+                                        '"crs":{"type":"name","properties":{"name":"EPSG:3857"}}}')
+
+    value = input_to_point( inp )
+    assert isinstance( value, QgsReferencedPointXY )
+    assert value.crs().authid() == 'EPSG:3857'
+    assert (value.x(), value.y()) == (4.0, 42.0)
+
+
+def test_point_input_gml_crs():
+    """ Test input point coordinates and crs from gml
+    """
+    inp = _point_input(FORMATS.GML, '<gml:Point srsName="EPSG:4326">'
+                                    '<gml:coordinates>4,42</gml:coordinates></gml:Point>')
+
+    value = input_to_point( inp )
+    assert isinstance( value, QgsReferencedPointXY )
+    assert value.crs().authid() == 'EPSG:4326'
+    assert (value.x(), value.y()) == (4.0, 42.0)
+
+
+def test_point_input_json_not_point():
+    """ Test non point json geometry fallback
+    """
+    inp = _point_input(FORMATS.GEOJSON, '{"type":"Polygon","coordinates":[[[0,0],[2,0],[2,2],[0,2],[0,0]]]}')
+
+    value = input_to_point( inp )
+    assert isinstance( value, QgsGeometry )
+    assert value.type() == QgsWkbTypes.PolygonGeometry
+    assert value.centroid().asPoint() == QgsPointXY(1.0, 1.0)
+
+
+def test_parse_layerspec():
+    """ Test layer specification parsing
+    """
+    specs = [
+        'france_parts',
+        'layer:france_parts',
+        'file:france_parts/france_parts.shp',
+        'layer:france_parts?'+urlencode((('select','OBJECTID=2662 OR OBJECTID=2664'),)),
+        'layer:france_parts?'+urlencode((('rect','1,2,3,4'),)),
+        'layer:france_parts?select=&rect=1,2,3,4',
+        'bad:france_parts',
+    ]
+    for spec in specs:
+        u  = urlparse(spec)
+        qs = parse_qs(u.query)
+        assert _fast_parse_layerspec(spec) == (u.scheme, u.path, qs.get('select',[]), qs.get('rect',[]))
+
+
+def test_cached_definitions():
+    """ Test that cached definitions build new equivalent inputs
+    """
+    alg = _find_algorithm('pyqgiswps_test:testdefinitions')
+
+    inputs1, outputs1 = parse_algorithm_definitions(alg)
+    inputs2, outputs2 = parse_algorithm_definitions(alg)
+
+    assert len(inputs1) == len(inputs2) == 3
+    assert len(outputs1) == len(outputs2) == 1
+
+    for first, second in zip(inputs1 + outputs1, inputs2 + outputs2):
+        assert first is not second
+        assert type(first) is type(second)
+        assert etree.tostring(first.describe_xml()) == etree.tostring(second.describe_xml())
+
+    for first, second in zip(inputs1, inputs2):
+        assert first.metadata is not second.metadata
+        assert first.allowed_values is not second.allowed_values
+
+    crs = inputs2[0]
+    assert crs.identifier == 'CRS'
+    assert isinstance(crs.default, QgsCoordinateReferenceSystem)
+    assert crs.default.authid() == 'EPSG:3857'